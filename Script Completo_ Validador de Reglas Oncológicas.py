@@ -8,37 +8,78 @@ Valida compliance con protocolos de cáncer de mama usando SHACL + SPARQL
 Uso:
     python3 oncology_validator.py --patient BC-2025-001
     python3 oncology_validator.py --all
+    python3 oncology_validator.py --all --workers 4
     python3 oncology_validator.py --report
+    python3 oncology_validator.py --summary
+    python3 oncology_validator.py --summary --sparql
+    python3 oncology_validator.py --summary --shacl
 """
 
 import json
+import os
+import re
+import shutil
+import subprocess
 import sys
+import tempfile
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
-from typing import List, Dict, Tuple, Optional
-from dataclasses import dataclass
-from enum import Enum
+from typing import Any, List, Dict, Tuple, Optional, FrozenSet, Sequence
+from dataclasses import dataclass, replace
+from functools import partial
+from enum import IntEnum
+
+def _load_pandas():
+    """Importar pandas solo cuando se valida la cohorte (~0.5s de arranque); None si no está instalado"""
+    try:
+        import pandas
+    except ImportError:
+        return None
+    return pandas
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+try:
+    import pyoxigraph
+except ImportError:
+    pyoxigraph = None
 
 # ========================================
 # TIPOS Y ENUMS
 # ========================================
 
-class RuleSeverity(Enum):
-    """Niveles de severidad de reglas"""
-    CRITICAL = "🔴 CRITICAL"
-    HIGH = "🟠 HIGH"
-    MEDIUM = "🟡 MEDIUM"
-    LOW = "🟢 LOW"
-    INFO = "ℹ️  INFO"
+class RuleSeverity(IntEnum):
+    """Niveles de severidad de reglas (códigos enteros; la etiqueta se aplica al imprimir)"""
+    CRITICAL = 0
+    HIGH = 1
+    MEDIUM = 2
+    LOW = 3
+    INFO = 4
 
-class RuleStatus(Enum):
-    """Estados de reglas"""
-    COMPLIANT = "✅ COMPLIANT"
-    WARNING = "⚠️  WARNING"
-    VIOLATION = "❌ VIOLATION"
+class RuleStatus(IntEnum):
+    """Estados de reglas (códigos enteros; la etiqueta se aplica al imprimir)"""
+    COMPLIANT = 0
+    WARNING = 1
+    VIOLATION = 2
 
-@dataclass
+SEVERITY_LABEL = ("🔴 CRITICAL", "🟠 HIGH", "🟡 MEDIUM", "🟢 LOW", "ℹ️  INFO")
+STATUS_LABEL = ("✅ COMPLIANT", "⚠️  WARNING", "❌ VIOLATION")
+
+def format_severity(severity: int) -> str:
+    """Etiqueta con emoji de una severidad"""
+    return SEVERITY_LABEL[severity]
+
+def format_status(status: int) -> str:
+    """Etiqueta con emoji de un estado"""
+    return STATUS_LABEL[status]
+
+@dataclass(frozen=True, slots=True)
 class RuleResult:
-    """Resultado de validación de una regla"""
+    """Resultado de validación de una regla (inmutable: las instancias N/A se comparten)"""
     rule_name: str
     rule_id: str
     status: RuleStatus
@@ -48,6 +89,54 @@ class RuleResult:
     details: Optional[Dict] = None
     affected_field: Optional[str] = None
 
+@dataclass
+class PatientIndex:
+    """Índices precalculados de un paciente (construidos una vez por validación)"""
+    med_list: Tuple[str, ...]
+    med_names: FrozenSet[str]
+    drug_mentions: FrozenSet[str]
+    consult_types: FrozenSet[str]
+    imaging_types: FrozenSet[str]
+    obs: Dict[str, Any]
+    obs_lower: Dict[str, Any]
+    er_pos: bool
+    pr_pos: bool
+    pr_neg: bool
+    her2_3plus: bool
+    brca_present: bool
+
+# ========================================
+# VOCABULARIO CLÍNICO
+# ========================================
+
+HORMONE_THERAPIES = frozenset({'Tamoxifen', 'Letrozole', 'Anastrozole', 'Exemestane', 'Fulvestrant'})
+HER2_THERAPIES = frozenset({'Herceptin', 'Trastuzumab'})
+CYP3A4_INHIBITORS = ('Fluconazole', 'Ketoconazole', 'Itraconazole', 'Voriconazole',
+                     'Clarithromycin', 'Erythromycin', 'Ritonavir', 'Diltiazem', 'Verapamil')
+ANTHRACYCLINES = ('Doxorubicin', 'Epirubicin', 'Daunorubicin', 'Idarubicin')
+CARDIAC_MONITORING_STUDIES = ('ECHO', 'MUGA')
+STAGE_IV_STAGING_STUDIES = ('PET-CT', 'Bone Scan', 'MRI Liver')
+PATHOLOGY_REPORT_FIELDS = ('er_status', 'pr_status', 'her2_status', 'ki67', 'grade')
+# Versiones en conjunto para diferencias en C; las tuplas fijan el orden de los mensajes
+REQUIRED_STAGE_IV_IMAGING = frozenset(STAGE_IV_STAGING_STUDIES)
+REQUIRED_PATHOLOGY_FIELDS = frozenset(PATHOLOGY_REPORT_FIELDS)
+
+# Vocabulario de fármacos buscado en texto libre de medicaciones (nombre, dosis)
+DRUG_VOCAB = (tuple(sorted(HORMONE_THERAPIES)) + tuple(sorted(HER2_THERAPIES)) + ('Paclitaxel', 'Docetaxel')
+              + CYP3A4_INHIBITORS + ANTHRACYCLINES)
+
+def _build_drug_automaton():
+    """Autómata Aho-Corasick sobre DRUG_VOCAB (None si pyahocorasick no está instalado)"""
+    if ahocorasick is None:
+        return None
+    automaton = ahocorasick.Automaton()
+    for drug in DRUG_VOCAB:
+        automaton.add_word(drug.lower(), drug)
+    automaton.make_automaton()
+    return automaton
+
+DRUG_AUTOMATON = _build_drug_automaton()
+
 # ========================================
 # DATOS DE PACIENTES (Simulado)
 # ========================================
@@ -181,6 +270,296 @@ PATIENTS_DB = {
     }
 }
 
+# ========================================
+# INDEXACIÓN DE PACIENTES
+# ========================================
+
+def _scan_drug_mentions(text: str) -> FrozenSet[str]:
+    """Fármacos de DRUG_VOCAB mencionados en un texto libre, en una sola pasada"""
+    text = text.lower()
+    if DRUG_AUTOMATON is not None:
+        return frozenset(drug for _, drug in DRUG_AUTOMATON.iter(text))
+    return frozenset(drug for drug in DRUG_VOCAB if drug.lower() in text)
+
+def _index_patient(patient: Dict) -> PatientIndex:
+    """Construir índices del paciente una sola vez antes de evaluar las reglas"""
+    med_list = tuple(m['name'] for m in patient['medications'])
+    obs = {field: o.get('value', '') for field, o in patient['observations'].items()}
+    # Solo se normalizan los valores de texto (p.ej. ki67 puede venir como número o null)
+    obs_lower = {field: value.lower() if isinstance(value, str) else value for field, value in obs.items()}
+    return PatientIndex(
+        med_list=med_list,
+        med_names=frozenset(med_list),
+        drug_mentions=_scan_drug_mentions("\n".join(
+            f"{m['name']} {m.get('dose', '')}" for m in patient['medications']
+        )),
+        consult_types=frozenset(c['type'] for c in patient.get('consultations', [])),
+        imaging_types=frozenset(i['type'] for i in patient.get('imaging', [])),
+        obs=obs,
+        obs_lower=obs_lower,
+        er_pos=obs_lower.get('er_status') == 'positive',
+        pr_pos=obs_lower.get('pr_status') == 'positive',
+        pr_neg=obs_lower.get('pr_status') == 'negative',
+        her2_3plus=obs_lower.get('her2_status') == '3+',
+        brca_present=obs_lower.get('brca1') == 'present'
+    )
+
+def _therapy_years(medication: Dict) -> Optional[float]:
+    """Duración planificada de una terapia en años (None si no tiene fecha de fin)"""
+    start = medication.get('start_date')
+    end = medication.get('end_date')
+    if not (start and end):
+        return None
+    return (datetime.strptime(end, "%Y-%m-%d") - datetime.strptime(start, "%Y-%m-%d")).days / 365.25
+
+# ========================================
+# REGLAS COMO CONSULTAS SPARQL
+# ========================================
+# Las consultas usan el vocabulario ex: propio de patients_to_turtle(), no el RDF que genera
+# FHIRtoRDFConverter (códigos LOINC/SNOMED, sin consultas ni estudios de imagen): no se pueden
+# ejecutar tal cual sobre la salida del conversor.
+
+SPARQL_PREFIXES = """PREFIX ex: <http://example.org/>
+PREFIX xsd: <http://www.w3.org/2001/XMLSchema#>
+"""
+
+def _literal(value) -> str:
+    """Literal Turtle/SPARQL (la sintaxis de escape de JSON es compatible)"""
+    return json.dumps(value, ensure_ascii=False)
+
+def _in(var: str, terms) -> str:
+    """FILTER de pertenencia (SHACL-SPARQL no admite VALUES dentro de una restricción)"""
+    return f"FILTER({var} IN ({', '.join(_literal(t) for t in terms)}))"
+
+def _contains_any(var: str, terms) -> str:
+    return "FILTER(" + " || ".join(f"CONTAINS({var}, {_literal(t)})" for t in terms) + ")"
+
+def _optional_in(var: str, path: str, terms) -> str:
+    """OPTIONAL que liga `var` a los valores de `path` incluidos en `terms` (se cuentan en HAVING)"""
+    return f"OPTIONAL {{ ?p {path} {var} . {_in(var, terms)} }}"
+
+def _observation(var: str, code: str, value: str) -> str:
+    """Patrón: el paciente tiene la observación `code` con valor `value` (sin distinguir mayúsculas)"""
+    return (f'?p ex:hasObservation ?{var} . ?{var} ex:hasCode "{code}" ; ex:hasValue ?{var}_v . '
+            f'FILTER(LCASE(?{var}_v) = "{value}")')
+
+# Texto libre de cada medicación (nombre + dosis), como en _index_patient()
+_MED_TEXT = ('?p ex:treatedWith ?{m} . ?{m} ex:hasName ?{m}_n . OPTIONAL {{ ?{m} ex:hasDose ?{m}_d }} '
+             'BIND(LCASE(CONCAT(?{m}_n, " ", COALESCE(?{m}_d, ""))) AS ?{m}_text)')
+
+# Por regla: (patrón sobre el paciente ?p, condición HAVING o None). El paciente NO cumple la regla
+# cuando el patrón casa y, si hay HAVING, su grupo la satisface. Las ausencias ("no tiene X") se
+# expresan con OPTIONAL + COUNT en vez de FILTER NOT EXISTS, que en Oxigraph crece de forma
+# superlineal con el tamaño de la cohorte.
+RULE_PATTERNS = {
+    "R001": (_observation("er", "er_status", "positive") + " "
+             + _optional_in("?hormone", "ex:treatedWith/ex:hasName", sorted(HORMONE_THERAPIES)),
+             "COUNT(?hormone) = 0"),
+    "R002": (_observation("her2", "her2_status", "3+") + " "
+             + _optional_in("?her2_rx", "ex:treatedWith/ex:hasName", sorted(HER2_THERAPIES)),
+             "COUNT(?her2_rx) = 0"),
+    "R003": (_observation("brca", "brca1", "present") + " "
+             + _optional_in("?consult", "ex:hadConsultation/ex:hasType", ("genetic_counseling",)),
+             "COUNT(?consult) = 0"),
+    "R004": ('?p ex:hasAge ?age . FILTER(?age < 40) '
+             + _optional_in("?consult", "ex:hadConsultation/ex:hasType", ("fertility_preservation",)),
+             "COUNT(?consult) = 0"),
+    "R005": (_MED_TEXT.format(m="tam") + ' FILTER(CONTAINS(?tam_text, "tamoxifen")) '
+             + _MED_TEXT.format(m="inh") + " " + _contains_any("?inh_text", (d.lower() for d in CYP3A4_INHIBITORS)),
+             None),
+    "R006": (_MED_TEXT.format(m="ant") + " " + _contains_any("?ant_text", (d.lower() for d in ANTHRACYCLINES)) + " "
+             + _optional_in("?study", "ex:hasImaging/ex:hasType", CARDIAC_MONITORING_STUDIES),
+             "COUNT(?study) = 0"),
+    "R007": ('?p ex:treatedWith ?m . ?m ex:hasName "Tamoxifen" .'
+             ' OPTIONAL { ?m ex:startDate ?start } OPTIONAL { ?m ex:endDate ?end }'
+             ' FILTER(!BOUND(?start) || !BOUND(?end)'
+             ' || xsd:date(?end) - xsd:date(?start) < "P1826DT6H"^^xsd:dayTimeDuration)',
+             None),
+    "R008": ('?p ex:hasCondition/ex:hasClinicalStage ?stage . FILTER(STRSTARTS(?stage, "IV")) '
+             + _optional_in("?study", "ex:hasImaging/ex:hasType", STAGE_IV_STAGING_STUDIES),
+             f"COUNT(DISTINCT ?study) < {len(STAGE_IV_STAGING_STUDIES)}"),
+    "R009": ('?p ex:hasCondition/ex:hasClinicalStage ?stage . FILTER(STRSTARTS(?stage, "III") || STRSTARTS(?stage, "IV")) '
+             + _optional_in("?field", "ex:hasObservation/ex:hasCode", PATHOLOGY_REPORT_FIELDS),
+             f"COUNT(DISTINCT ?field) < {len(PATHOLOGY_REPORT_FIELDS)}"),
+    "R010": (_observation("er", "er_status", "positive") + " " + _observation("pr", "pr_status", "negative"),
+             None),
+}
+
+def _rule_select(rule_id: str, var: str, head: str = "") -> str:
+    """SELECT de los `var` (?mrn o $this) que no cumplen la regla"""
+    pattern, having = RULE_PATTERNS[rule_id]
+    where = head + re.sub(r"\?p\b", "$this", pattern) if var == "$this" else head + pattern
+    if having is None:
+        return f"SELECT DISTINCT {var} WHERE {{\n  {where}\n}}"
+    return f"SELECT {var} WHERE {{\n  {where}\n}}\nGROUP BY {var}\nHAVING ({having})"
+
+# Una consulta por regla; cada una devuelve los ?mrn que NO cumplen (violación o advertencia)
+RULE_QUERIES = {
+    rule_id: SPARQL_PREFIXES + _rule_select(rule_id, "?mrn", "?p a ex:Patient ; ex:hasMRN ?mrn .\n  ")
+    for rule_id in RULE_PATTERNS
+}
+
+def patients_to_turtle(patients: Dict) -> str:
+    """Exportar pacientes a RDF Turtle con el vocabulario ex: que consultan RULE_QUERIES
+
+    Es un vocabulario interno del validador (observaciones por nombre de campo, ex:hadConsultation,
+    ex:hasImaging, estadio en la condición) y no coincide con el de FHIRtoRDFConverter.
+    """
+    lines = ["@prefix ex: <http://example.org/> .", "@prefix xsd: <http://www.w3.org/2001/XMLSchema#> .", ""]
+    for n, (mrn, patient) in enumerate(patients.items()):
+        p = f"ex:Patient_{n}"
+        lines.append(f"{p} a ex:Patient ; ex:hasMRN {_literal(mrn)} ; ex:hasAge {int(patient['age'])} ;")
+        lines.append(f"    ex:hasCondition {p}_condition .")
+        stage = patient['diagnosis'].get('stage')
+        lines.append(f"{p}_condition a ex:BreastCancerDisease" + (f" ; ex:hasClinicalStage {_literal(stage)} ." if stage else " ."))
+        for field, obs in patient['observations'].items():
+            value = obs.get('value', '')
+            if value is None:
+                lines.append(f"{p} ex:hasObservation [ ex:hasCode {_literal(field)} ] .")
+            else:
+                lines.append(f"{p} ex:hasObservation [ ex:hasCode {_literal(field)} ; ex:hasValue {_literal(str(value))} ] .")
+        for med in patient['medications']:
+            props = [f"ex:hasName {_literal(med['name'])}"]
+            if med.get('dose'):
+                props.append(f"ex:hasDose {_literal(med['dose'])}")
+            if med.get('start_date'):
+                props.append(f"ex:startDate {_literal(med['start_date'])}")
+            if med.get('end_date'):
+                props.append(f"ex:endDate {_literal(med['end_date'])}")
+            lines.append(f"{p} ex:treatedWith [ {' ; '.join(props)} ] .")
+        for consultation in patient.get('consultations', []):
+            lines.append(f"{p} ex:hadConsultation [ ex:hasType {_literal(consultation['type'])} ] .")
+        for study in patient.get('imaging', []):
+            lines.append(f"{p} ex:hasImaging [ ex:hasType {_literal(study['type'])} ] .")
+    return "\n".join(lines) + "\n"
+
+def load_patients_store(patients: Dict) -> "pyoxigraph.Store":
+    """Crear un store Oxigraph en memoria con la cohorte exportada a RDF"""
+    store = pyoxigraph.Store()
+    store.load(patients_to_turtle(patients).encode("utf-8"), format=pyoxigraph.RdfFormat.TURTLE)
+    return store
+
+def sparql_violations(store: "pyoxigraph.Store", rules: Sequence[Dict]) -> Dict[str, List[str]]:
+    """Ejecutar la consulta de cada regla de `rules` sobre el store: MRNs que no cumplen cada regla"""
+    return {
+        rule["id"]: sorted(solution["mrn"].value for solution in store.query(RULE_QUERIES[rule["id"]]))
+        for rule in rules
+    }
+
+# ========================================
+# REGLAS COMO SHAPES SHACL (validador externo)
+# ========================================
+
+# Comando del validador SHACL-SPARQL (Apache Jena); {shapes} y {data} se sustituyen por las rutas.
+# El motor debe soportar resta de xsd:date (R007); Jena y Oxigraph lo hacen, rdflib/pySHACL no.
+SHACL_VALIDATE_CMD = ("shacl", "validate", "--shapes", "{shapes}", "--data", "{data}")
+
+_SHACL_SEVERITY = {"CRITICAL": "sh:Violation", "HIGH": "sh:Violation", "MEDIUM": "sh:Warning", "LOW": "sh:Info"}
+
+def rules_to_shacl(rules: Sequence[Dict]) -> str:
+    """Generar un sh:NodeShape con restricción SPARQL por regla (focus node = paciente)"""
+    lines = [
+        "@prefix ex: <http://example.org/> .",
+        "@prefix sh: <http://www.w3.org/ns/shacl#> .",
+        "@prefix xsd: <http://www.w3.org/2001/XMLSchema#> .",
+        "",
+        "ex: sh:declare",
+        '    [ sh:prefix "ex" ; sh:namespace "http://example.org/"^^xsd:anyURI ] ,',
+        '    [ sh:prefix "xsd" ; sh:namespace "http://www.w3.org/2001/XMLSchema#"^^xsd:anyURI ] .',
+    ]
+    for rule in rules:
+        select = _rule_select(rule["id"], "$this")
+        lines += [
+            "",
+            f"ex:{rule['id']}Shape a sh:NodeShape ;",
+            "    sh:targetClass ex:Patient ;",
+            f"    sh:severity {_SHACL_SEVERITY.get(rule['severity'].name, 'sh:Violation')} ;",
+            "    sh:sparql [",
+            "        a sh:SPARQLConstraint ;",
+            f"        sh:message {_literal(rule['name'])} ;",
+            "        sh:prefixes ex: ;",
+            f"        sh:select {_literal(select)}",
+            "    ] .",
+        ]
+    return "\n".join(lines) + "\n"
+
+def write_shapes(rules: Sequence[Dict], path: str) -> str:
+    """Escribir el shapes graph solo si cambió, para reutilizarlo entre ejecuciones"""
+    shapes = rules_to_shacl(rules)
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            if f.read() == shapes:
+                return path
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(shapes)
+    return path
+
+def shacl_violations(patients: Dict, rules: Sequence[Dict], command: Sequence[str] = SHACL_VALIDATE_CMD,
+                     shapes_path: Optional[str] = None) -> Dict[str, List[str]]:
+    """Validar toda la cohorte en una sola invocación del validador SHACL externo
+
+    Shapes y datos se generan en un directorio temporal; `shapes_path` permite además conservar
+    el shapes graph (si no se puede escribir ahí, se usa el temporal).
+    """
+    # patients_to_turtle() nombra a los pacientes por su posición en la cohorte
+    mrn_by_node = {f"http://example.org/Patient_{n}": mrn for n, mrn in enumerate(patients)}
+    
+    if shapes_path is not None:
+        try:
+            write_shapes(rules, shapes_path)
+        except OSError as e:
+            print(f"⚠️  No se pudo escribir {shapes_path} ({e}); se usa un fichero temporal", file=sys.stderr)
+            shapes_path = None
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            if shapes_path is None:
+                shapes_path = write_shapes(rules, os.path.join(tmp, "rules_shapes.ttl"))
+            data_path = os.path.join(tmp, "patients.ttl")
+            with open(data_path, "w", encoding="utf-8") as f:
+                f.write(patients_to_turtle(patients))
+            try:
+                proc = subprocess.run([arg.format(shapes=shapes_path, data=data_path) for arg in command],
+                                      capture_output=True, text=True)
+            except OSError as e:
+                raise RuntimeError(f"SHACL validator could not be started ({command[0]}): {e}") from e
+    except OSError as e:
+        raise RuntimeError(f"Could not write SHACL input files: {e}") from e
+    if not proc.stdout.strip():
+        raise RuntimeError(f"SHACL validator failed ({proc.returncode}): {proc.stderr.strip()}")
+    
+    # Leer el sh:ValidationReport (Turtle) y agrupar focus nodes por shape de origen
+    report = pyoxigraph.Store()
+    report.load(proc.stdout.encode("utf-8"), format=pyoxigraph.RdfFormat.TURTLE)
+    noncompliant = {rule["id"]: set() for rule in rules}
+    for solution in report.query(
+        "PREFIX sh: <http://www.w3.org/ns/shacl#> "
+        "SELECT ?focus ?shape WHERE { ?r a sh:ValidationResult ; sh:focusNode ?focus ; sh:sourceShape ?shape }"
+    ):
+        rule_id = solution["shape"].value.rsplit("/", 1)[-1][:-len("Shape")]
+        if rule_id in noncompliant and solution["focus"].value in mrn_by_node:
+            noncompliant[rule_id].add(mrn_by_node[solution["focus"].value])
+    return {rule_id: sorted(mrns) for rule_id, mrns in noncompliant.items()}
+
+# ========================================
+# RESULTADOS N/A COMPARTIDOS
+# ========================================
+
+# Una única instancia inmutable por regla para el caso "no aplica" (el más frecuente)
+_NA: Dict[str, RuleResult] = {
+    result.rule_id: result for result in (
+        RuleResult("ER+ → Hormone Therapy", "R001", RuleStatus.COMPLIANT, RuleSeverity.LOW, "N/A: Patient is ER-negative"),
+        RuleResult("HER2+ → Herceptin", "R002", RuleStatus.COMPLIANT, RuleSeverity.LOW, "N/A: Patient is HER2-negative or unknown"),
+        RuleResult("BRCA+ → Genetic Counseling", "R003", RuleStatus.COMPLIANT, RuleSeverity.LOW, "N/A: Patient BRCA-negative"),
+        RuleResult("Young Patient Fertility", "R004", RuleStatus.COMPLIANT, RuleSeverity.LOW, "N/A: Patient aged 40 or older"),
+        RuleResult("Tamoxifen Interaction", "R005", RuleStatus.COMPLIANT, RuleSeverity.LOW, "N/A: Patient not on Tamoxifen"),
+        RuleResult("Anthracycline Cardiac Monitoring", "R006", RuleStatus.COMPLIANT, RuleSeverity.LOW, "N/A: Patient not on Anthracycline"),
+        RuleResult("Adjuvant Therapy Duration", "R007", RuleStatus.COMPLIANT, RuleSeverity.LOW, "N/A: Patient not on adjuvant Tamoxifen"),
+        RuleResult("Metastatic Complete Staging", "R008", RuleStatus.COMPLIANT, RuleSeverity.LOW, "N/A: Patient is not Stage IV"),
+        RuleResult("Stage III+ Pathology Report", "R009", RuleStatus.COMPLIANT, RuleSeverity.LOW, "N/A: Patient is below Stage III"),
+        RuleResult("PR+ Hormone Response", "R010", RuleStatus.COMPLIANT, RuleSeverity.LOW, "N/A: PR status negative or unknown"),
+    )
+}
+
 # ========================================
 # VALIDADOR DE REGLAS ONCOLÓGICAS
 # ========================================
@@ -188,97 +567,25 @@ PATIENTS_DB = {
 class OncologyRulesValidator:
     """Validador de reglas de negocio oncológicas"""
     
-    def __init__(self):
-        self.rules = self._define_rules()
+    def __init__(self, sparql_store: Optional["pyoxigraph.Store"] = None,
+                 shacl_command: Optional[Sequence[str]] = None, cache_results: bool = False):
+        self.rules = RULES
         self.patients = PATIENTS_DB
-    
-    def _define_rules(self) -> List[Dict]:
-        """Definir todas las reglas de validación"""
-        return [
-            {
-                "id": "R001",
-                "name": "ER+ → Hormone Therapy Mandatory",
-                "description": "If Estrogen Receptor positive, hormone therapy MUST be prescribed",
-                "severity": RuleSeverity.CRITICAL,
-                "check_func": self._check_er_positive_therapy
-            },
-            {
-                "id": "R002",
-                "name": "HER2+ → Herceptin Mandatory",
-                "description": "If HER2 3+, Trastuzumab (Herceptin) MUST be prescribed",
-                "severity": RuleSeverity.CRITICAL,
-                "check_func": self._check_her2_herceptin
-            },
-            {
-                "id": "R003",
-                "name": "BRCA+ → Genetic Counseling Required",
-                "description": "If BRCA1/BRCA2 mutation detected, genetic counseling MANDATORY",
-                "severity": RuleSeverity.HIGH,
-                "check_func": self._check_brca_counseling
-            },
-            {
-                "id": "R004",
-                "name": "Young Patient → Fertility Discussion",
-                "description": "Age < 40 with breast cancer SHOULD discuss fertility preservation",
-                "severity": RuleSeverity.MEDIUM,
-                "check_func": self._check_fertility_young
-            },
-            {
-                "id": "R005",
-                "name": "Tamoxifen Interaction Check",
-                "description": "Tamoxifen + CYP3A4 inhibitors = DANGEROUS interaction",
-                "severity": RuleSeverity.HIGH,
-                "check_func": self._check_tamoxifen_interactions
-            },
-            {
-                "id": "R006",
-                "name": "Anthracycline → Cardiac Monitoring",
-                "description": "Patients on Anthracycline MUST have cardiac monitoring (ECHO/EF)",
-                "severity": RuleSeverity.HIGH,
-                "check_func": self._check_anthracycline_monitoring
-            },
-            {
-                "id": "R007",
-                "name": "Adjuvant Therapy Duration",
-                "description": "Tamoxifen adjuvant should be minimum 5 years (or until 10 years)",
-                "severity": RuleSeverity.MEDIUM,
-                "check_func": self._check_adjuvant_duration
-            },
-            {
-                "id": "R008",
-                "name": "Metastatic → Complete Staging",
-                "description": "Stage IV MUST have PET-CT, Bone Scan, Liver Imaging",
-                "severity": RuleSeverity.CRITICAL,
-                "check_func": self._check_metastatic_staging
-            },
-            {
-                "id": "R009",
-                "name": "Stage III+ → Pathology Report",
-                "description": "Stage III or higher MUST have complete pathology report",
-                "severity": RuleSeverity.HIGH,
-                "check_func": self._check_pathology_report
-            },
-            {
-                "id": "R010",
-                "name": "PR+ Positive → Hormone Response Expected",
-                "description": "PR+ patients typically respond better to hormone therapy",
-                "severity": RuleSeverity.LOW,
-                "check_func": self._check_pr_status
-            },
-        ]
+        # Store RDF con la cohorte; si se configura, las reglas de cohorte se ejecutan como SPARQL
+        self.sparql_store = sparql_store
+        # Comando de un validador SHACL externo; si se configura, las reglas se validan como shapes
+        self.shacl_command = shacl_command
+        # Caché opcional de resultados por MRN (LRU acotado); tras modificar un paciente o las reglas
+        # hay que llamar a invalidate()
+        self._results_cache: Optional["OrderedDict[str, List[RuleResult]]"] = OrderedDict() if cache_results else None
     
     # ====== IMPLEMENTACIÓN DE REGLAS ======
     
-    def _check_er_positive_therapy(self, patient: Dict) -> RuleResult:
+    @staticmethod
+    def _check_er_positive_therapy(patient: Dict, idx: PatientIndex) -> RuleResult:
         """REGLA 1: ER+ → Debe tener terapia hormonal"""
-        er_status = patient['observations'].get('er_status', {}).get('value', 'unknown')
-        medications = [m['name'] for m in patient['medications']]
-        
-        hormone_therapies = ['Tamoxifen', 'Letrozole', 'Anastrozole', 'Exemestane', 'Fulvestrant']
-        has_hormone_therapy = any(drug in medications for drug in hormone_therapies)
-        
-        if er_status.lower() == 'positive':
-            if not has_hormone_therapy:
+        if idx.er_pos:
+            if not HORMONE_THERAPIES & idx.med_names:
                 return RuleResult(
                     rule_name="ER+ → Hormone Therapy",
                     rule_id="R001",
@@ -288,12 +595,12 @@ class OncologyRulesValidator:
                     action="MUST prescribe: Tamoxifen (premenopausal) or Aromatase Inhibitor (postmenopausal)",
                     affected_field="medications",
                     details={
-                        "er_status": er_status,
-                        "prescribed_therapies": medications or "NONE"
+                        "er_status": idx.obs['er_status'],
+                        "prescribed_therapies": list(idx.med_list) or "NONE"
                     }
                 )
             else:
-                therapy = next(d for d in medications if d in hormone_therapies)
+                therapy = next(d for d in idx.med_list if d in HORMONE_THERAPIES)
                 return RuleResult(
                     rule_name="ER+ → Hormone Therapy",
                     rule_id="R001",
@@ -303,21 +610,13 @@ class OncologyRulesValidator:
                     details={"therapy": therapy}
                 )
         
-        return RuleResult(
-            rule_name="ER+ → Hormone Therapy",
-            rule_id="R001",
-            status=RuleStatus.COMPLIANT,
-            severity=RuleSeverity.LOW,
-            message="N/A: Patient is ER-negative"
-        )
+        return _NA["R001"]
     
-    def _check_her2_herceptin(self, patient: Dict) -> RuleResult:
+    @staticmethod
+    def _check_her2_herceptin(patient: Dict, idx: PatientIndex) -> RuleResult:
         """REGLA 2: HER2+ → Debe tener Herceptin"""
-        her2_status = patient['observations'].get('her2_status', {}).get('value', 'unknown')
-        medications = [m['name'] for m in patient['medications']]
-        
-        if her2_status == '3+':
-            if 'Herceptin' not in medications and 'Trastuzumab' not in medications:
+        if idx.her2_3plus:
+            if not idx.med_names & HER2_THERAPIES:
                 return RuleResult(
                     rule_name="HER2+ → Herceptin",
                     rule_id="R002",
@@ -337,24 +636,13 @@ class OncologyRulesValidator:
                     message="✓ HER2+ patient correctly prescribed Herceptin"
                 )
         
-        return RuleResult(
-            rule_name="HER2+ → Herceptin",
-            rule_id="R002",
-            status=RuleStatus.COMPLIANT,
-            severity=RuleSeverity.LOW,
-            message="N/A: Patient is HER2-negative or unknown"
-        )
+        return _NA["R002"]
     
-    def _check_brca_counseling(self, patient: Dict) -> RuleResult:
+    @staticmethod
+    def _check_brca_counseling(patient: Dict, idx: PatientIndex) -> RuleResult:
         """REGLA 3: BRCA+ → Debe tener genetic counseling"""
-        brca_status = patient['observations'].get('brca1', {}).get('value', 'unknown')
-        has_counseling = any(
-            c['type'] == 'genetic_counseling' 
-            for c in patient.get('consultations', [])
-        )
-        
-        if brca_status.lower() == 'present':
-            if not has_counseling:
+        if idx.brca_present:
+            if 'genetic_counseling' not in idx.consult_types:
                 return RuleResult(
                     rule_name="BRCA+ → Genetic Counseling",
                     rule_id="R003",
@@ -373,26 +661,550 @@ class OncologyRulesValidator:
                     message="✓ Genetic counseling documented for BRCA+ patient"
                 )
         
-        return RuleResult(
-            rule_name="BRCA+ → Genetic Counseling",
-            rule_id="R003",
-            status=RuleStatus.COMPLIANT,
-            severity=RuleSeverity.LOW,
-            message="N/A: Patient BRCA-negative"
-        )
+        return _NA["R003"]
     
-    def _check_fertility_young(self, patient: Dict) -> RuleResult:
+    @staticmethod
+    def _check_fertility_young(patient: Dict, idx: PatientIndex) -> RuleResult:
         """REGLA 4: Edad < 40 → Considerar fertility preservation"""
         age = patient['age']
-        has_fertility_discussion = any(
-            c['type'] == 'fertility_preservation'
-            for c in patient.get('consultations', [])
-        )
         
         if age < 40:
-            if not has_fertility_discussion:
+            if 'fertility_preservation' not in idx.consult_types:
                 return RuleResult(
                     rule_name="Young Patient Fertility",
                     rule_id="R004",
                     status=RuleStatus.WARNING,
-                    severity=RuleSeverity.MEDIUM
\ No newline at end of file
+                    severity=RuleSeverity.MEDIUM,
+                    message=f"Patient aged {age} with NO fertility preservation discussion documented",
+                    action="SHOULD discuss fertility preservation before starting systemic therapy",
+                    affected_field="consultations",
+                    details={"age": age}
+                )
+            else:
+                return RuleResult(
+                    rule_name="Young Patient Fertility",
+                    rule_id="R004",
+                    status=RuleStatus.COMPLIANT,
+                    severity=RuleSeverity.MEDIUM,
+                    message="✓ Fertility preservation discussed with young patient"
+                )
+        
+        return _NA["R004"]
+    
+    @staticmethod
+    def _check_tamoxifen_interactions(patient: Dict, idx: PatientIndex) -> RuleResult:
+        """REGLA 5: Tamoxifen + inhibidores CYP3A4 → Interacción peligrosa"""
+        if 'Tamoxifen' in idx.drug_mentions:
+            interacting = [d for d in CYP3A4_INHIBITORS if d in idx.drug_mentions]
+            
+            if interacting:
+                return RuleResult(
+                    rule_name="Tamoxifen Interaction",
+                    rule_id="R005",
+                    status=RuleStatus.VIOLATION,
+                    severity=RuleSeverity.HIGH,
+                    message=f"Tamoxifen prescribed together with CYP3A4 inhibitor(s): {', '.join(interacting)}",
+                    action="MUST review interaction - switch to a non-interacting alternative or monitor closely",
+                    affected_field="medications",
+                    details={"interacting_drugs": interacting}
+                )
+            else:
+                return RuleResult(
+                    rule_name="Tamoxifen Interaction",
+                    rule_id="R005",
+                    status=RuleStatus.COMPLIANT,
+                    severity=RuleSeverity.HIGH,
+                    message="✓ No CYP3A4 inhibitors prescribed with Tamoxifen"
+                )
+        
+        return _NA["R005"]
+    
+    @staticmethod
+    def _check_anthracycline_monitoring(patient: Dict, idx: PatientIndex) -> RuleResult:
+        """REGLA 6: Antraciclinas → Monitoreo cardíaco (ECHO/MUGA)"""
+        if not idx.drug_mentions.isdisjoint(ANTHRACYCLINES):
+            if idx.imaging_types.isdisjoint(CARDIAC_MONITORING_STUDIES):
+                return RuleResult(
+                    rule_name="Anthracycline Cardiac Monitoring",
+                    rule_id="R006",
+                    status=RuleStatus.VIOLATION,
+                    severity=RuleSeverity.HIGH,
+                    message="Patient on Anthracycline but NO cardiac monitoring (ECHO/MUGA) documented",
+                    action="MUST order baseline ECHO or MUGA scan (ejection fraction)",
+                    affected_field="imaging"
+                )
+            else:
+                return RuleResult(
+                    rule_name="Anthracycline Cardiac Monitoring",
+                    rule_id="R006",
+                    status=RuleStatus.COMPLIANT,
+                    severity=RuleSeverity.HIGH,
+                    message="✓ Cardiac monitoring documented for Anthracycline therapy"
+                )
+        
+        return _NA["R006"]
+    
+    @staticmethod
+    def _check_adjuvant_duration(patient: Dict, idx: PatientIndex) -> RuleResult:
+        """REGLA 7: Tamoxifen adyuvante → Mínimo 5 años (se evalúan todas las pautas de Tamoxifen)"""
+        if 'Tamoxifen' in idx.med_names:
+            courses = [(m, _therapy_years(m)) for m in patient['medications'] if m['name'] == 'Tamoxifen']
+            
+            if any(years is None for _, years in courses):
+                return RuleResult(
+                    rule_name="Adjuvant Therapy Duration",
+                    rule_id="R007",
+                    status=RuleStatus.WARNING,
+                    severity=RuleSeverity.MEDIUM,
+                    message="Tamoxifen duration not documented (missing start or end date)",
+                    action="SHOULD document the planned Tamoxifen course (start and end date)",
+                    affected_field="medications"
+                )
+            short = [(m, years) for m, years in courses if years < 5]
+            if short:
+                tamoxifen, years = min(short, key=lambda course: course[1])
+                return RuleResult(
+                    rule_name="Adjuvant Therapy Duration",
+                    rule_id="R007",
+                    status=RuleStatus.WARNING,
+                    severity=RuleSeverity.MEDIUM,
+                    message=f"Tamoxifen planned for {years:.1f} years (minimum 5 years recommended)",
+                    action="SHOULD extend adjuvant Tamoxifen to at least 5 years (up to 10 years)",
+                    affected_field="medications",
+                    details={
+                        "start_date": tamoxifen['start_date'],
+                        "end_date": tamoxifen['end_date'],
+                        "duration_years": round(years, 1)
+                    }
+                )
+            
+            return RuleResult(
+                rule_name="Adjuvant Therapy Duration",
+                rule_id="R007",
+                status=RuleStatus.COMPLIANT,
+                severity=RuleSeverity.MEDIUM,
+                message="✓ Tamoxifen duration meets adjuvant recommendation"
+            )
+        
+        return _NA["R007"]
+    
+    @staticmethod
+    def _check_metastatic_staging(patient: Dict, idx: PatientIndex) -> RuleResult:
+        """REGLA 8: Estadio IV → Estudios de extensión completos"""
+        stage = patient['diagnosis'].get('stage', '')
+        
+        if stage.startswith('IV'):
+            missing = sorted(REQUIRED_STAGE_IV_IMAGING - idx.imaging_types, key=STAGE_IV_STAGING_STUDIES.index)
+            
+            if missing:
+                return RuleResult(
+                    rule_name="Metastatic Complete Staging",
+                    rule_id="R008",
+                    status=RuleStatus.VIOLATION,
+                    severity=RuleSeverity.CRITICAL,
+                    message=f"Stage IV patient missing staging studies: {', '.join(missing)}",
+                    action=f"MUST order: {', '.join(missing)}",
+                    affected_field="imaging",
+                    details={
+                        "stage": stage,
+                        "missing_studies": missing,
+                        "performed_studies": sorted(idx.imaging_types) or "NONE"
+                    }
+                )
+            else:
+                return RuleResult(
+                    rule_name="Metastatic Complete Staging",
+                    rule_id="R008",
+                    status=RuleStatus.COMPLIANT,
+                    severity=RuleSeverity.CRITICAL,
+                    message="✓ Complete staging documented for Stage IV patient"
+                )
+        
+        return _NA["R008"]
+    
+    @staticmethod
+    def _check_pathology_report(patient: Dict, idx: PatientIndex) -> RuleResult:
+        """REGLA 9: Estadio III+ → Reporte de patología completo"""
+        stage = patient['diagnosis'].get('stage', '')
+        
+        if stage.startswith('III') or stage.startswith('IV'):
+            missing = sorted(REQUIRED_PATHOLOGY_FIELDS - idx.obs_lower.keys(), key=PATHOLOGY_REPORT_FIELDS.index)
+            
+            if missing:
+                return RuleResult(
+                    rule_name="Stage III+ Pathology Report",
+                    rule_id="R009",
+                    status=RuleStatus.VIOLATION,
+                    severity=RuleSeverity.HIGH,
+                    message=f"Stage {stage} patient with incomplete pathology report",
+                    action=f"MUST complete pathology report: {', '.join(missing)}",
+                    affected_field="observations",
+                    details={"stage": stage, "missing_fields": missing}
+                )
+            else:
+                return RuleResult(
+                    rule_name="Stage III+ Pathology Report",
+                    rule_id="R009",
+                    status=RuleStatus.COMPLIANT,
+                    severity=RuleSeverity.HIGH,
+                    message="✓ Complete pathology report documented"
+                )
+        
+        return _NA["R009"]
+    
+    @staticmethod
+    def _check_pr_status(patient: Dict, idx: PatientIndex) -> RuleResult:
+        """REGLA 10: PR+ → Respuesta hormonal esperada"""
+        if idx.pr_pos:
+            return RuleResult(
+                rule_name="PR+ Hormone Response",
+                rule_id="R010",
+                status=RuleStatus.COMPLIANT,
+                severity=RuleSeverity.INFO,
+                message="✓ PR+ patient - favorable response to hormone therapy expected"
+            )
+        elif idx.pr_neg and idx.er_pos:
+            return RuleResult(
+                rule_name="PR+ Hormone Response",
+                rule_id="R010",
+                status=RuleStatus.WARNING,
+                severity=RuleSeverity.LOW,
+                message="ER+/PR- patient - hormone therapy response may be reduced",
+                action="Consider PR-negative status when selecting endocrine therapy",
+                affected_field="observations"
+            )
+        
+        return _NA["R010"]
+    
+    # ====== EJECUCIÓN DE VALIDACIONES ======
+    
+    def validate_patient(self, mrn: str) -> List[RuleResult]:
+        """Validar todas las reglas para un paciente (memoizado por MRN si cache_results=True)"""
+        if self._results_cache is None:
+            return validate_one(self.patients[mrn], self.rules)
+        results = self._results_cache.get(mrn)
+        if results is None:
+            results = validate_one(self.patients[mrn], self.rules)
+            self._results_cache[mrn] = results
+            if len(self._results_cache) > RESULTS_CACHE_SIZE:
+                self._results_cache.popitem(last=False)
+        else:
+            self._results_cache.move_to_end(mrn)
+        # RuleResult es inmutable pero `details` no: cada llamador recibe su propia copia
+        return [replace(r, details=_copy_details(r.details)) if r.details else r for r in results]
+    
+    def invalidate(self, mrn: Optional[str] = None):
+        """Descartar los resultados memoizados de un paciente (o de todos si mrn es None)"""
+        if self._results_cache is None:
+            return
+        if mrn is None:
+            self._results_cache.clear()
+        else:
+            self._results_cache.pop(mrn, None)
+    
+    def validate_all_patients(self, workers: Optional[int] = None) -> Dict[str, List[RuleResult]]:
+        """Validar todas las reglas para todos los pacientes (en `workers` procesos si workers > 1)"""
+        if not workers or workers < 2:
+            return {mrn: self.validate_patient(mrn) for mrn in self.patients}
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = executor.map(partial(validate_one, rules=self.rules), self.patients.values(),
+                                   chunksize=VALIDATION_CHUNKSIZE)
+            return dict(zip(self.patients, results))
+
+    # ====== VALIDACIÓN VECTORIZADA DE COHORTE ======
+
+    def _build_frame(self) -> "pd.DataFrame":
+        """Aplanar PATIENTS_DB una sola vez en una tabla columnar (una fila por paciente)"""
+        records = []
+        for mrn, patient in self.patients.items():
+            idx = _index_patient(patient)
+            tamoxifen_years = [_therapy_years(m) for m in patient['medications'] if m['name'] == 'Tamoxifen']
+            records.append({
+                "mrn": mrn,
+                "age": patient['age'],
+                "stage": patient['diagnosis'].get('stage', ''),
+                "er_pos": idx.er_pos,
+                "pr_neg": idx.pr_neg,
+                "her2_3plus": idx.her2_3plus,
+                "brca_present": idx.brca_present,
+                "obs_fields": frozenset(idx.obs_lower),
+                "med_names": idx.med_names,
+                "drug_mentions": idx.drug_mentions,
+                "consult_types": idx.consult_types,
+                "imaging_types": idx.imaging_types,
+                "tamoxifen_short": any(years is not None and years < 5 for years in tamoxifen_years),
+                "tamoxifen_undocumented": None in tamoxifen_years,
+            })
+
+        df = _load_pandas().DataFrame.from_records(records, index="mrn")
+
+        df["age_lt_40"] = df["age"] < 40
+        df["stage_iv"] = df["stage"].str.startswith("IV")
+        df["stage_iii_plus"] = df["stage"].str.startswith("III") | df["stage_iv"]
+
+        df["has_hormone"] = df["med_names"].map(lambda s: bool(s & HORMONE_THERAPIES))
+        df["has_herceptin"] = df["med_names"].map(lambda s: bool(s & HER2_THERAPIES))
+        df["on_tamoxifen"] = df["drug_mentions"].map(lambda s: 'Tamoxifen' in s)
+        df["has_cyp3a4_inhibitor"] = df["drug_mentions"].map(lambda s: not s.isdisjoint(CYP3A4_INHIBITORS))
+        df["on_anthracycline"] = df["drug_mentions"].map(lambda s: not s.isdisjoint(ANTHRACYCLINES))
+        df["has_genetic_counseling"] = df["consult_types"].map(lambda s: 'genetic_counseling' in s)
+        df["has_fertility_consult"] = df["consult_types"].map(lambda s: 'fertility_preservation' in s)
+        df["has_cardiac_monitoring"] = df["imaging_types"].map(lambda s: not s.isdisjoint(CARDIAC_MONITORING_STUDIES))
+        df["staging_complete"] = df["imaging_types"].map(lambda s: REQUIRED_STAGE_IV_IMAGING <= s)
+        df["pathology_complete"] = df["obs_fields"].map(lambda s: REQUIRED_PATHOLOGY_FIELDS <= s)
+
+        return df
+
+    def _rule_masks(self, df: "pd.DataFrame") -> Dict[str, "pd.Series"]:
+        """Máscara booleana por regla: True donde el paciente NO cumple (violación o advertencia)"""
+        return {
+            "R001": df["er_pos"] & ~df["has_hormone"],
+            "R002": df["her2_3plus"] & ~df["has_herceptin"],
+            "R003": df["brca_present"] & ~df["has_genetic_counseling"],
+            "R004": df["age_lt_40"] & ~df["has_fertility_consult"],
+            "R005": df["on_tamoxifen"] & df["has_cyp3a4_inhibitor"],
+            "R006": df["on_anthracycline"] & ~df["has_cardiac_monitoring"],
+            "R007": df["tamoxifen_short"] | df["tamoxifen_undocumented"],
+            "R008": df["stage_iv"] & ~df["staging_complete"],
+            "R009": df["stage_iii_plus"] & ~df["pathology_complete"],
+            "R010": df["er_pos"] & df["pr_neg"],
+        }
+
+    def cohort_violations(self) -> Dict[str, List[str]]:
+        """MRNs que no cumplen cada regla, evaluando toda la cohorte en una pasada vectorizada"""
+        if self.shacl_command is not None:
+            return shacl_violations(self.patients, self.rules, self.shacl_command)
+        
+        if self.sparql_store is not None:
+            return sparql_violations(self.sparql_store, self.rules)
+        
+        if _load_pandas() is None:
+            # Sin pandas: mismo resultado reutilizando la validación por paciente
+            noncompliant = {rule["id"]: [] for rule in self.rules}
+            for mrn, results in self.validate_all_patients().items():
+                for r in results:
+                    if r.status != RuleStatus.COMPLIANT:
+                        noncompliant[r.rule_id].append(mrn)
+            return noncompliant
+
+        if not self.patients:
+            # DataFrame.from_records([], index="mrn") no tiene columna "mrn"
+            return {rule["id"]: [] for rule in self.rules}
+
+        df = self._build_frame()
+        masks = self._rule_masks(df)
+        return {rule_id: df.index[mask].tolist() for rule_id, mask in masks.items()}
+
+    def print_patient_report(self, mrn: str, results: List[RuleResult]):
+        """Imprimir reporte de validación de un paciente"""
+        patient = self.patients[mrn]
+        diagnosis = patient['diagnosis']
+        
+        print("=" * 70)
+        print(f"PACIENTE: {patient['name']} ({mrn})")
+        print(f"Edad: {patient['age']} | Diagnóstico: {diagnosis['name']} | Estadio: {diagnosis['stage']}")
+        print("=" * 70)
+        
+        for result in results:
+            print(f"\n[{result.rule_id}] {result.rule_name}")
+            print(f"  {format_status(result.status)} | {format_severity(result.severity)}")
+            print(f"  {result.message}")
+            if result.action:
+                print(f"  → Acción: {result.action}")
+            if result.details:
+                print(f"  Detalles: {json.dumps(result.details, ensure_ascii=False)}")
+        
+        violations = sum(1 for r in results if r.status == RuleStatus.VIOLATION)
+        warnings = sum(1 for r in results if r.status == RuleStatus.WARNING)
+        print("\n" + "-" * 70)
+        print(f"📊 Resumen: {violations} violaciones, {warnings} advertencias, "
+              f"{len(results) - violations - warnings} reglas cumplidas")
+        print("")
+    
+    def generate_report(self) -> Dict:
+        """Generar reporte de compliance de toda la cohorte"""
+        all_results = self.validate_all_patients()
+        
+        report = {
+            "generated": datetime.now().isoformat(),
+            "total_patients": len(all_results),
+            "total_rules": len(self.rules),
+            "violations_by_rule": {rule["id"]: [] for rule in self.rules},
+            "patients": {}
+        }
+        
+        for mrn, results in all_results.items():
+            violations = [r for r in results if r.status == RuleStatus.VIOLATION]
+            warnings = [r for r in results if r.status == RuleStatus.WARNING]
+            for r in violations:
+                report["violations_by_rule"][r.rule_id].append(mrn)
+            
+            report["patients"][mrn] = {
+                "name": self.patients[mrn]["name"],
+                "violations": [f"{r.rule_id}: {r.message}" for r in violations],
+                "warnings": [f"{r.rule_id}: {r.message}" for r in warnings],
+                "compliance_rate": round(100 * (len(results) - len(violations)) / len(results), 1)
+            }
+        
+        return report
+
+
+# ========================================
+# DEFINICIÓN DE REGLAS (construida una sola vez al importar)
+# ========================================
+
+RULES: Tuple[Dict, ...] = (
+    {
+        "id": "R001",
+        "name": "ER+ → Hormone Therapy Mandatory",
+        "description": "If Estrogen Receptor positive, hormone therapy MUST be prescribed",
+        "severity": RuleSeverity.CRITICAL,
+        "check_func": OncologyRulesValidator._check_er_positive_therapy
+    },
+    {
+        "id": "R002",
+        "name": "HER2+ → Herceptin Mandatory",
+        "description": "If HER2 3+, Trastuzumab (Herceptin) MUST be prescribed",
+        "severity": RuleSeverity.CRITICAL,
+        "check_func": OncologyRulesValidator._check_her2_herceptin
+    },
+    {
+        "id": "R003",
+        "name": "BRCA+ → Genetic Counseling Required",
+        "description": "If BRCA1/BRCA2 mutation detected, genetic counseling MANDATORY",
+        "severity": RuleSeverity.HIGH,
+        "check_func": OncologyRulesValidator._check_brca_counseling
+    },
+    {
+        "id": "R004",
+        "name": "Young Patient → Fertility Discussion",
+        "description": "Age < 40 with breast cancer SHOULD discuss fertility preservation",
+        "severity": RuleSeverity.MEDIUM,
+        "check_func": OncologyRulesValidator._check_fertility_young
+    },
+    {
+        "id": "R005",
+        "name": "Tamoxifen Interaction Check",
+        "description": "Tamoxifen + CYP3A4 inhibitors = DANGEROUS interaction",
+        "severity": RuleSeverity.HIGH,
+        "check_func": OncologyRulesValidator._check_tamoxifen_interactions
+    },
+    {
+        "id": "R006",
+        "name": "Anthracycline → Cardiac Monitoring",
+        "description": "Patients on Anthracycline MUST have cardiac monitoring (ECHO/EF)",
+        "severity": RuleSeverity.HIGH,
+        "check_func": OncologyRulesValidator._check_anthracycline_monitoring
+    },
+    {
+        "id": "R007",
+        "name": "Adjuvant Therapy Duration",
+        "description": "Tamoxifen adjuvant should be minimum 5 years (or until 10 years)",
+        "severity": RuleSeverity.MEDIUM,
+        "check_func": OncologyRulesValidator._check_adjuvant_duration
+    },
+    {
+        "id": "R008",
+        "name": "Metastatic → Complete Staging",
+        "description": "Stage IV MUST have PET-CT, Bone Scan, Liver Imaging",
+        "severity": RuleSeverity.CRITICAL,
+        "check_func": OncologyRulesValidator._check_metastatic_staging
+    },
+    {
+        "id": "R009",
+        "name": "Stage III+ → Pathology Report",
+        "description": "Stage III or higher MUST have complete pathology report",
+        "severity": RuleSeverity.HIGH,
+        "check_func": OncologyRulesValidator._check_pathology_report
+    },
+    {
+        "id": "R010",
+        "name": "PR+ Positive → Hormone Response Expected",
+        "description": "PR+ patients typically respond better to hormone therapy",
+        "severity": RuleSeverity.LOW,
+        "check_func": OncologyRulesValidator._check_pr_status
+    },
+)
+
+# Pacientes por tarea enviada al pool de procesos (amortiza el coste de IPC/pickle)
+VALIDATION_CHUNKSIZE = 64
+
+def validate_one(patient: Dict, rules: Sequence[Dict] = RULES) -> List[RuleResult]:
+    """Evaluar las reglas sobre un paciente (función pura de módulo, serializable para ProcessPoolExecutor)"""
+    idx = _index_patient(patient)
+    return [rule["check_func"](patient, idx) for rule in rules]
+
+# Tamaño máximo de la caché opcional de resultados por validador (cache_results=True)
+RESULTS_CACHE_SIZE = 1024
+
+def _copy_details(details: Dict) -> Dict:
+    """Copia de un dict de details plano (copia también sus listas)"""
+    return {k: v.copy() if isinstance(v, list) else v for k, v in details.items()}
+
+def main():
+    """Función principal"""
+    if len(sys.argv) < 2:
+        print("Uso: python3 oncology_validator.py [--patient <MRN> | --all [--workers N] | --report | --summary [--sparql | --shacl]]")
+        print("")
+        print("Ejemplos:")
+        print("  python3 oncology_validator.py --patient BC-2025-001")
+        print("  python3 oncology_validator.py --all")
+        print("  python3 oncology_validator.py --all --workers 4")
+        print("  python3 oncology_validator.py --report")
+        print("  python3 oncology_validator.py --summary")
+        print("  python3 oncology_validator.py --summary --sparql")
+        print("  python3 oncology_validator.py --summary --shacl")
+        sys.exit(1)
+    
+    validator = OncologyRulesValidator()
+    option = sys.argv[1]
+    
+    if option == "--patient" and len(sys.argv) > 2:
+        mrn = sys.argv[2]
+        if mrn not in validator.patients:
+            print(f"❌ Error: Paciente no encontrado: {mrn}", file=sys.stderr)
+            sys.exit(1)
+        validator.print_patient_report(mrn, validator.validate_patient(mrn))
+    elif option == "--all":
+        workers = None
+        if "--workers" in sys.argv[2:]:
+            try:
+                workers = int(sys.argv[sys.argv.index("--workers") + 1])
+            except (IndexError, ValueError):
+                print("❌ Error: --workers requiere un número entero", file=sys.stderr)
+                sys.exit(1)
+        for mrn, results in validator.validate_all_patients(workers).items():
+            validator.print_patient_report(mrn, results)
+    elif option == "--report":
+        print(json.dumps(validator.generate_report(), indent=2, ensure_ascii=False))
+    elif option == "--summary":
+        if "--sparql" in sys.argv[2:]:
+            if pyoxigraph is None:
+                print("❌ Error: --sparql requiere pyoxigraph (pip install pyoxigraph)", file=sys.stderr)
+                sys.exit(1)
+            validator.sparql_store = load_patients_store(validator.patients)
+        elif "--shacl" in sys.argv[2:]:
+            if pyoxigraph is None:
+                print("❌ Error: --shacl requiere pyoxigraph para leer el reporte (pip install pyoxigraph)", file=sys.stderr)
+                sys.exit(1)
+            if shutil.which(SHACL_VALIDATE_CMD[0]) is None:
+                print(f"❌ Error: --shacl requiere el comando '{SHACL_VALIDATE_CMD[0]}' en el PATH (Apache Jena)",
+                      file=sys.stderr)
+                sys.exit(1)
+            validator.shacl_command = SHACL_VALIDATE_CMD
+        try:
+            noncompliant = validator.cohort_violations()
+        except RuntimeError as e:
+            print(f"❌ Error: {e}", file=sys.stderr)
+            sys.exit(1)
+        print(f"📊 Cohorte: {len(validator.patients)} pacientes")
+        for rule in validator.rules:
+            mrns = noncompliant[rule["id"]]
+            print(f"  [{rule['id']}] {rule['name']}: {len(mrns)} → {', '.join(mrns) or '-'}")
+    else:
+        print(f"❌ Error: Opción no válida: {option}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -11,16 +11,75 @@ Uso:
     python3 fhir_to_rdf.py input.json output.ttl
 """
 
+import io
 import json
+import os
 import sys
+import tempfile
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, List, Optional, TextIO
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Parser para la lectura completa del Bundle (cuando no hay ijson): orjson si está disponible
+_json_loads = orjson.loads if orjson else json.loads
+
+# Tamaño del buffer de salida: agrupa las escrituras pequeñas de cada triple en pocas syscalls
+OUTPUT_BUFFER_SIZE = 64 * 1024
+
+# Año actual calculado una sola vez (la conversión es de corta duración)
+_CURRENT_YEAR = datetime.now().year
+
+# Vocabulario RDF: una única instancia (interned) de cada predicado, clase y datatype
+P_END_DATE = sys.intern("ex:endDate")
+P_HAS_AGE = sys.intern("ex:hasAge")
+P_HAS_BIRTH_DATE = sys.intern("ex:hasBirthDate")
+P_HAS_CODE = sys.intern("ex:hasCode")
+P_HAS_CONDITION = sys.intern("ex:hasCondition")
+P_HAS_COUNTRY = sys.intern("ex:hasCountry")
+P_HAS_DATE = sys.intern("ex:hasDate")
+P_HAS_DOSE = sys.intern("ex:hasDose")
+P_HAS_GENDER = sys.intern("ex:hasGender")
+P_HAS_MRN = sys.intern("ex:hasMRN")
+P_HAS_NAME = sys.intern("ex:hasName")
+P_HAS_OBSERVATION = sys.intern("ex:hasObservation")
+P_HAS_STATUS = sys.intern("ex:hasStatus")
+P_HAS_UNIT = sys.intern("ex:hasUnit")
+P_HAS_VALUE = sys.intern("ex:hasValue")
+P_START_DATE = sys.intern("ex:startDate")
+P_TREATED_WITH = sys.intern("ex:treatedWith")
+P_TYPE = sys.intern("rdf:type")
+P_LABEL = sys.intern("rdfs:label")
+
+EX_BREAST_CANCER_DISEASE = sys.intern("ex:BreastCancerDisease")
+EX_CONDITION = sys.intern("ex:Condition")
+EX_LAB_OBSERVATION = sys.intern("ex:LabObservation")
+EX_PATIENT = sys.intern("ex:Patient")
+EX_THERAPY = sys.intern("ex:Therapy")
+FHIR_CONDITION = sys.intern("fhir:Condition")
+FHIR_MEDICATION_STATEMENT = sys.intern("fhir:MedicationStatement")
+FHIR_OBSERVATION = sys.intern("fhir:Observation")
+FHIR_PATIENT = sys.intern("fhir:Patient")
+
+XSD_DATE = sys.intern("xsd:date")
+XSD_DATE_TIME = sys.intern("xsd:dateTime")
+XSD_DECIMAL = sys.intern("xsd:decimal")
+XSD_INTEGER = sys.intern("xsd:integer")
+XSD_STRING = sys.intern("xsd:string")
 
 class FHIRtoRDFConverter:
-    """Convertidor de FHIR JSON a RDF Turtle"""
+    """Convertidor de FHIR JSON a RDF Turtle (escribe cada triple directamente en la salida)"""
     
-    def __init__(self):
-        self.prefixes = {
+    def __init__(self, out: TextIO):
+        self.prefixes = {sys.intern(prefix): uri for prefix, uri in {
             "ex": "http://example.org/",
             "fhir": "http://hl7.org/fhir/",
             "snomed": "http://snomed.info/id/",
@@ -32,101 +91,111 @@ class FHIRtoRDFConverter:
             "rdf": "http://www.w3.org/1999/02/22-rdf-syntax-ns#",
             "rdfs": "http://www.w3.org/2000/01/rdf-schema#",
             "xsd": "http://www.w3.org/2001/XMLSchema#",
-        }
-        self.turtle_lines = []
-        self.triples = {}
+        }.items()}
+        # Bloque @prefix completo (ordenado, salida estable entre ejecuciones), construido una vez
+        self._prefix_block = "".join(
+            f"@prefix {prefix}: <{uri}> .\n" for prefix, uri in sorted(self.prefixes.items())
+        ) + "\n"
+        self.out = out
+        self.triple_count = 0
+        self.patient_uri = None
+        self._current_subject = None
     
     def add_prefixes(self):
         """Agregar declaraciones PREFIX"""
-        for prefix, uri in self.prefixes.items():
-            self.turtle_lines.append(f"@prefix {prefix}: <{uri}> .")
-        self.turtle_lines.append("")
+        self.out.write(self._prefix_block)
+    
+    def add_header(self, label: str):
+        """Escribir bloque de comentario que encabeza cada recurso"""
+        self.close_subject()
+        self.out.writelines((
+            "\n# ========================================\n",
+            f"# {label}\n",
+            "# ========================================\n",
+        ))
+    
+    def close_subject(self):
+        """Cerrar con ' .' el bloque del sujeto abierto, si lo hay"""
+        if self._current_subject is not None:
+            self.out.write(" .\n")
+            self._current_subject = None
     
     def add_triple(self, subject: str, predicate: str, obj: str, 
                    is_literal: bool = False, datatype: Optional[str] = None):
-        """Agregar triple RDF"""
+        """Escribir triple RDF agrupando con ';' los triples consecutivos del mismo sujeto"""
+        if subject == self._current_subject:
+            self.out.write(" ;\n")
+        else:
+            self.close_subject()
+            self.out.write(f"{subject}\n")
+            self._current_subject = subject
         if is_literal and datatype:
-            triple = f'    {predicate} "{obj}"^^{datatype} ;'
+            self.out.write(f'    {predicate} "{obj}"^^{datatype}')
         elif is_literal:
-            triple = f'    {predicate} "{obj}" ;'
+            self.out.write(f'    {predicate} "{obj}"')
         else:
-            triple = f'    {predicate} {obj} ;'
-        
-        if subject not in self.triples:
-            self.triples[subject] = []
-        self.triples[subject].append((predicate, obj, triple))
+            self.out.write(f'    {predicate} {obj}')
+        self.triple_count += 1
     
-    def write_triples(self):
-        """Escribir triples acumulados a Turtle"""
-        for subject, predicates in self.triples.items():
-            self.turtle_lines.append(f"{subject}")
-            
-            for i, (pred, obj, line) in enumerate(predicates):
-                if i == len(predicates) - 1:
-                    self.turtle_lines.append(line.rstrip(';') + " .")
-                else:
-                    self.turtle_lines.append(line)
-            self.turtle_lines.append("")
-    
-    def get_age_from_birthdate(self, birthdate: str) -> int:
-        """Calcular edad desde fecha de nacimiento"""
-        try:
-            birth_year = int(birthdate.split("-")[0])
-            return datetime.now().year - birth_year
-        except:
-            return None
+    def get_age_from_birthdate(self, birthdate: str) -> Optional[int]:
+        """Calcular edad desde fecha de nacimiento (YYYY[-MM[-DD]])"""
+        year = birthdate[:4]
+        if len(year) == 4 and year.isascii() and year.isdigit():
+            return _CURRENT_YEAR - int(year)
+        return None
     
     def convert_patient(self, patient_resource: Dict):
         """Convertir FHIR Patient a RDF"""
         patient_id = patient_resource.get("id")
         patient_uri = f"ex:Patient_{patient_id}"
         
+        full_names = []
+        for name in patient_resource.get("name", []):
+            given = " ".join(name.get("given", []))
+            family = name.get("family", "")
+            full_names.append(f"{given} {family}".strip())
+        
+        self.add_header(f"PACIENTE: {full_names[-1] if full_names else patient_id}")
+        
         # Tipos
-        self.add_triple(patient_uri, "rdf:type", "fhir:Patient")
-        self.add_triple(patient_uri, "rdf:type", "ex:Patient")
+        self.add_triple(patient_uri, P_TYPE, FHIR_PATIENT)
+        self.add_triple(patient_uri, P_TYPE, EX_PATIENT)
         
         # MRN (Medical Record Number)
         for identifier in patient_resource.get("identifier", []):
             mrn = identifier.get("value")
             if mrn:
-                self.add_triple(patient_uri, "ex:hasMRN", mrn, 
-                              is_literal=True, datatype="xsd:string")
+                self.add_triple(patient_uri, P_HAS_MRN, mrn, 
+                              is_literal=True, datatype=XSD_STRING)
         
         # Nombre
-        for name in patient_resource.get("name", []):
-            given = " ".join(name.get("given", []))
-            family = name.get("family", "")
-            full_name = f"{given} {family}".strip()
-            self.add_triple(patient_uri, "ex:hasName", full_name, 
-                          is_literal=True, datatype="xsd:string")
+        for full_name in full_names:
+            self.add_triple(patient_uri, P_HAS_NAME, full_name, 
+                          is_literal=True, datatype=XSD_STRING)
         
         # Fecha de nacimiento y edad
         if "birthDate" in patient_resource:
             birthdate = patient_resource["birthDate"]
-            self.add_triple(patient_uri, "ex:hasBirthDate", birthdate, 
-                          is_literal=True, datatype="xsd:date")
+            self.add_triple(patient_uri, P_HAS_BIRTH_DATE, birthdate, 
+                          is_literal=True, datatype=XSD_DATE)
             
             age = self.get_age_from_birthdate(birthdate)
             if age:
-                self.add_triple(patient_uri, "ex:hasAge", str(age), 
-                              is_literal=True, datatype="xsd:integer")
+                self.add_triple(patient_uri, P_HAS_AGE, str(age), 
+                              is_literal=True, datatype=XSD_INTEGER)
         
         # Género
         if "gender" in patient_resource:
             gender = patient_resource["gender"]
-            self.add_triple(patient_uri, "ex:hasGender", gender, 
-                          is_literal=True, datatype="xsd:string")
+            self.add_triple(patient_uri, P_HAS_GENDER, gender, 
+                          is_literal=True, datatype=XSD_STRING)
         
         # País (desde extensión)
         for address in patient_resource.get("address", []):
             country = address.get("country")
             if country:
-                self.add_triple(patient_uri, "ex:hasCountry", country, 
-                              is_literal=True, datatype="xsd:string")
-        
-        self.turtle_lines.append(f"# ========================================")
-        self.turtle_lines.append(f"# PACIENTE: {full_name if 'full_name' in locals() else patient_id}")
-        self.turtle_lines.append(f"# ========================================")
+                self.add_triple(patient_uri, P_HAS_COUNTRY, country, 
+                              is_literal=True, datatype=XSD_STRING)
         
         return patient_uri
     
@@ -134,10 +203,11 @@ class FHIRtoRDFConverter:
         """Convertir FHIR Condition a RDF"""
         condition_id = condition_resource.get("id")
         condition_uri = f"ex:Condition_{condition_id}"
+        self.add_header(f"CONDICIÓN: {condition_id}")
         
         # Tipos
-        self.add_triple(condition_uri, "rdf:type", "fhir:Condition")
-        self.add_triple(condition_uri, "rdf:type", "ex:Condition")
+        self.add_triple(condition_uri, P_TYPE, FHIR_CONDITION)
+        self.add_triple(condition_uri, P_TYPE, EX_CONDITION)
         
         # Si es cáncer de mama
         is_breast_cancer = False
@@ -151,33 +221,29 @@ class FHIRtoRDFConverter:
             if "snomed" in system.lower():
                 if code == "254837009":  # Breast cancer
                     is_breast_cancer = True
-                self.add_triple(condition_uri, "ex:hasCode", f"snomed:{code}")
+                self.add_triple(condition_uri, P_HAS_CODE, f"snomed:{code}")
             elif "icd-10" in system.lower():
                 if code.startswith("C50"):  # Breast cancer ICD-10
                     is_breast_cancer = True
-                self.add_triple(condition_uri, "ex:hasCode", f"icd10:{code}")
+                self.add_triple(condition_uri, P_HAS_CODE, f"icd10:{code}")
             
             if display:
-                self.add_triple(condition_uri, "rdfs:label", display, 
+                self.add_triple(condition_uri, P_LABEL, display, 
                               is_literal=True)
         
         # Estado clínico
         for status_coding in condition_resource.get("clinicalStatus", {}).get("coding", []):
             status = status_coding.get("code")
             if status:
-                self.add_triple(condition_uri, "ex:hasStatus", status, 
-                              is_literal=True, datatype="xsd:string")
+                self.add_triple(condition_uri, P_HAS_STATUS, status, 
+                              is_literal=True, datatype=XSD_STRING)
         
         # Marcar como BreastCancerDisease si aplica
         if is_breast_cancer:
-            self.add_triple(condition_uri, "rdf:type", "ex:BreastCancerDisease")
+            self.add_triple(condition_uri, P_TYPE, EX_BREAST_CANCER_DISEASE)
         
         # Relacionar con paciente
-        self.add_triple(patient_uri, "ex:hasCondition", condition_uri)
-        
-        self.turtle_lines.append(f"# ========================================")
-        self.turtle_lines.append(f"# CONDICIÓN: {condition_id}")
-        self.turtle_lines.append(f"# ========================================")
+        self.add_triple(patient_uri, P_HAS_CONDITION, condition_uri)
         
         return condition_uri
     
@@ -185,18 +251,19 @@ class FHIRtoRDFConverter:
         """Convertir FHIR Observation a RDF"""
         obs_id = observation_resource.get("id")
         obs_uri = f"ex:Observation_{obs_id}"
+        self.add_header(f"OBSERVACIÓN: {obs_id}")
         
         # Tipos
-        self.add_triple(obs_uri, "rdf:type", "fhir:Observation")
-        self.add_triple(obs_uri, "rdf:type", "ex:LabObservation")
+        self.add_triple(obs_uri, P_TYPE, FHIR_OBSERVATION)
+        self.add_triple(obs_uri, P_TYPE, EX_LAB_OBSERVATION)
         
         # Nombre de la observación
         for coding in observation_resource.get("code", {}).get("coding", []):
             display = coding.get("display", "")
             if display:
-                self.add_triple(obs_uri, "ex:hasName", display, 
-                              is_literal=True, datatype="xsd:string")
-                self.add_triple(obs_uri, "rdfs:label", display, 
+                self.add_triple(obs_uri, P_HAS_NAME, display, 
+                              is_literal=True, datatype=XSD_STRING)
+                self.add_triple(obs_uri, P_LABEL, display, 
                               is_literal=True)
         
         # Valor (CodeableConcept)
@@ -204,32 +271,28 @@ class FHIRtoRDFConverter:
             for coding in observation_resource["valueCodeableConcept"].get("coding", []):
                 value = coding.get("display", "")
                 if value:
-                    self.add_triple(obs_uri, "ex:hasValue", value, 
-                                  is_literal=True, datatype="xsd:string")
+                    self.add_triple(obs_uri, P_HAS_VALUE, value, 
+                                  is_literal=True, datatype=XSD_STRING)
         
         # Valor (Quantity)
         elif "valueQuantity" in observation_resource:
             value = observation_resource["valueQuantity"].get("value")
             unit = observation_resource["valueQuantity"].get("unit")
             if value:
-                self.add_triple(obs_uri, "ex:hasValue", str(value), 
-                              is_literal=True, datatype="xsd:decimal")
+                self.add_triple(obs_uri, P_HAS_VALUE, str(value), 
+                              is_literal=True, datatype=XSD_DECIMAL)
             if unit:
-                self.add_triple(obs_uri, "ex:hasUnit", unit, 
-                              is_literal=True, datatype="xsd:string")
+                self.add_triple(obs_uri, P_HAS_UNIT, unit, 
+                              is_literal=True, datatype=XSD_STRING)
         
         # Fecha
         if "issued" in observation_resource:
             issued = observation_resource["issued"]
-            self.add_triple(obs_uri, "ex:hasDate", issued, 
-                          is_literal=True, datatype="xsd:dateTime")
+            self.add_triple(obs_uri, P_HAS_DATE, issued, 
+                          is_literal=True, datatype=XSD_DATE_TIME)
         
         # Relacionar con paciente
-        self.add_triple(patient_uri, "ex:hasObservation", obs_uri)
-        
-        self.turtle_lines.append(f"# ========================================")
-        self.turtle_lines.append(f"# OBSERVACIÓN: {obs_id}")
-        self.turtle_lines.append(f"# ========================================")
+        self.add_triple(patient_uri, P_HAS_OBSERVATION, obs_uri)
         
         return obs_uri
     
@@ -237,82 +300,84 @@ class FHIRtoRDFConverter:
         """Convertir FHIR MedicationStatement a RDF"""
         med_id = medication_resource.get("id")
         med_uri = f"ex:Medication_{med_id}"
+        self.add_header(f"MEDICACIÓN: {med_id}")
         
         # Tipos
-        self.add_triple(med_uri, "rdf:type", "fhir:MedicationStatement")
-        self.add_triple(med_uri, "rdf:type", "ex:Therapy")
+        self.add_triple(med_uri, P_TYPE, FHIR_MEDICATION_STATEMENT)
+        self.add_triple(med_uri, P_TYPE, EX_THERAPY)
         
         # Nombre del medicamento
         for coding in medication_resource.get("medicationCodeableConcept", {}).get("coding", []):
             display = coding.get("display", "")
             if display:
-                self.add_triple(med_uri, "rdfs:label", display, 
+                self.add_triple(med_uri, P_LABEL, display, 
                               is_literal=True)
-                self.add_triple(med_uri, "ex:hasName", display, 
-                              is_literal=True, datatype="xsd:string")
+                self.add_triple(med_uri, P_HAS_NAME, display, 
+                              is_literal=True, datatype=XSD_STRING)
         
         # Dosis
         for dosage in medication_resource.get("dosage", []):
             text = dosage.get("text", "")
             if text:
-                self.add_triple(med_uri, "ex:hasDose", text, 
-                              is_literal=True, datatype="xsd:string")
+                self.add_triple(med_uri, P_HAS_DOSE, text, 
+                              is_literal=True, datatype=XSD_STRING)
         
         # Fecha efectiva
         if "effectivePeriod" in medication_resource:
             start = medication_resource["effectivePeriod"].get("start")
             end = medication_resource["effectivePeriod"].get("end")
             if start:
-                self.add_triple(med_uri, "ex:startDate", start, 
-                              is_literal=True, datatype="xsd:date")
+                self.add_triple(med_uri, P_START_DATE, start, 
+                              is_literal=True, datatype=XSD_DATE)
             if end:
-                self.add_triple(med_uri, "ex:endDate", end, 
-                              is_literal=True, datatype="xsd:date")
+                self.add_triple(med_uri, P_END_DATE, end, 
+                              is_literal=True, datatype=XSD_DATE)
         
         # Relacionar con paciente
-        self.add_triple(patient_uri, "ex:treatedWith", med_uri)
-        
-        self.turtle_lines.append(f"# ========================================")
-        self.turtle_lines.append(f"# MEDICACIÓN: {med_id}")
-        self.turtle_lines.append(f"# ========================================")
+        self.add_triple(patient_uri, P_TREATED_WITH, med_uri)
         
         return med_uri
     
-    def convert_bundle(self, fhir_bundle: Dict) -> str:
-        """Convertir FHIR Bundle completo a RDF"""
+    def convert_resource(self, resource: Dict):
+        """Convertir un recurso FHIR según su resourceType"""
+        resource_type = resource.get("resourceType")
+        
+        try:
+            if resource_type == "Patient":
+                self.patient_uri = self.convert_patient(resource)
+            elif resource_type == "Condition" and self.patient_uri:
+                self.convert_condition(resource, self.patient_uri)
+            elif resource_type == "Observation" and self.patient_uri:
+                self.convert_observation(resource, self.patient_uri)
+            elif resource_type == "MedicationStatement" and self.patient_uri:
+                self.convert_medication(resource, self.patient_uri)
+        except Exception as e:
+            print(f"⚠️  Error procesando {resource_type}: {e}", file=sys.stderr)
+    
+    def convert_resources(self, resources: Iterable[Dict]) -> int:
+        """Convertir una secuencia de recursos FHIR, devuelve el número de triples escritos"""
         # Agregar prefijos
         self.add_prefixes()
         
-        self.turtle_lines.append("# ========================================")
-        self.turtle_lines.append("# RDF GENERADO DESDE FHIR")
-        self.turtle_lines.append(f"# Generado: {datetime.now().isoformat()}")
-        self.turtle_lines.append("# ========================================")
-        self.turtle_lines.append("")
+        self.out.writelines((
+            "# ========================================\n",
+            "# RDF GENERADO DESDE FHIR\n",
+            f"# Generado: {datetime.now().isoformat()}\n",
+            "# ========================================\n",
+        ))
         
-        patient_uri = None
+        # Procesar recursos en orden (los recursos siguen al Patient al que pertenecen)
+        for resource in resources:
+            self.convert_resource(resource)
+        self.close_subject()
         
-        # Procesar entries del bundle
-        for entry in fhir_bundle.get("entry", []):
-            resource = entry.get("resource", {})
-            resource_type = resource.get("resourceType")
-            
-            try:
-                if resource_type == "Patient":
-                    patient_uri = self.convert_patient(resource)
-                elif resource_type == "Condition" and patient_uri:
-                    self.convert_condition(resource, patient_uri)
-                elif resource_type == "Observation" and patient_uri:
-                    self.convert_observation(resource, patient_uri)
-                elif resource_type == "MedicationStatement" and patient_uri:
-                    self.convert_medication(resource, patient_uri)
-            except Exception as e:
-                print(f"⚠️  Error procesando {resource_type}: {e}", file=sys.stderr)
-                continue
-        
-        # Escribir todos los triples
-        self.write_triples()
-        
-        return "\n".join(self.turtle_lines)
+        return self.triple_count
+    
+    def convert_bundle(self, fhir_bundle: Dict) -> int:
+        """Convertir FHIR Bundle completo (ya cargado en memoria) a RDF"""
+        return self.convert_resources(
+            entry.get("resource", {}) for entry in fhir_bundle.get("entry", [])
+        )
 
 
 def main():
@@ -328,30 +393,52 @@ def main():
     input_file = sys.argv[1]
     output_file = sys.argv[2] if len(sys.argv) > 2 else None
     
+    json_errors = (json.JSONDecodeError, ijson.JSONError) if ijson else (json.JSONDecodeError,)
+    
     try:
-        # Leer JSON FHIR
-        with open(input_file, 'r', encoding='utf-8') as f:
-            fhir_bundle = json.load(f)
-        
-        # Convertir a RDF
-        converter = FHIRtoRDFConverter()
-        rdf_turtle = converter.convert_bundle(fhir_bundle)
-        
-        # Escribir salida
-        if output_file:
-            with open(output_file, 'w', encoding='utf-8') as f:
-                f.write(rdf_turtle)
-            print(f"✅ RDF exportado a: {output_file}")
-        else:
-            print(rdf_turtle)
+        with open(input_file, 'rb') as f:
+            # Leer JSON FHIR: con ijson se procesa un recurso a la vez sin cargar el Bundle completo;
+            # si no, se parsea el Bundle de una vez (orjson o json)
+            if ijson:
+                resources = ijson.items(f, 'entry.item.resource', use_float=True)
+            else:
+                resources = (entry.get("resource", {}) for entry in _json_loads(f.read()).get("entry", []))
+            
+            # Convertir a RDF escribiendo directamente en la salida; a fichero se escribe en un
+            # temporal del mismo directorio que solo reemplaza al destino si la conversión termina
+            if output_file:
+                fd, tmp_path = tempfile.mkstemp(suffix=".ttl.tmp",
+                                                dir=os.path.dirname(os.path.abspath(output_file)))
+                try:
+                    # mkstemp crea el fichero con modo 0600; aplicar los permisos por defecto (umask)
+                    umask = os.umask(0)
+                    os.umask(umask)
+                    os.chmod(fd, 0o666 & ~umask)
+                    with open(fd, 'w', encoding='utf-8', buffering=OUTPUT_BUFFER_SIZE) as out:
+                        triple_count = FHIRtoRDFConverter(out).convert_resources(resources)
+                    os.replace(tmp_path, output_file)
+                except BaseException:
+                    os.unlink(tmp_path)
+                    raise
+                print(f"✅ RDF exportado a: {output_file}")
+            else:
+                sys.stdout.flush()
+                out = io.TextIOWrapper(io.BufferedWriter(sys.stdout.buffer, OUTPUT_BUFFER_SIZE),
+                                       encoding='utf-8')
+                try:
+                    triple_count = FHIRtoRDFConverter(out).convert_resources(resources)
+                finally:
+                    # Vaciar y soltar los envoltorios sin cerrar sys.stdout
+                    out.flush()
+                    out.detach().detach()
         
         print(f"✅ Conversión completada exitosamente")
-        print(f"📊 Triples generados: {len(converter.triples)}")
+        print(f"📊 Triples generados: {triple_count}")
         
     except FileNotFoundError:
         print(f"❌ Error: Archivo no encontrado: {input_file}", file=sys.stderr)
         sys.exit(1)
-    except json.JSONDecodeError:
+    except json_errors:
         print(f"❌ Error: JSON inválido en: {input_file}", file=sys.stderr)
         sys.exit(1)
     except Exception as e:
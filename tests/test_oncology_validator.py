@@ -0,0 +1,70 @@
+import importlib.util
+import os
+import unittest
+
+SCRIPT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                      "Script Completo_ Validador de Reglas Oncológicas.py")
+
+spec = importlib.util.spec_from_file_location("oncology_validator", SCRIPT)
+validator_module = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(validator_module)
+
+
+def python_noncompliant(validator) -> dict:
+    """MRNs que no cumplen cada regla según la evaluación por paciente"""
+    noncompliant = {rule["id"]: [] for rule in validator.rules}
+    for mrn, results in validator.validate_all_patients().items():
+        for result in results:
+            if result.status != validator_module.RuleStatus.COMPLIANT:
+                noncompliant[result.rule_id].append(mrn)
+    return {rule_id: sorted(mrns) for rule_id, mrns in noncompliant.items()}
+
+
+def tamoxifen_patient(mrn: str, *courses) -> dict:
+    """Paciente mínimo con una o varias pautas de Tamoxifen (start_date, end_date o None)"""
+    medications = []
+    for start, end in courses:
+        medication = {"name": "Tamoxifen", "dose": "20mg daily", "start_date": start}
+        if end:
+            medication["end_date"] = end
+        medications.append(medication)
+    return {
+        "mrn": mrn, "name": mrn, "age": 55, "gender": "female",
+        "diagnosis": {"code": "254837009", "name": "IDC", "stage": "IIA", "status": "active"},
+        "observations": {"er_status": {"value": "Positive", "date": "2025-01-01"}},
+        "medications": medications, "consultations": [], "imaging": [],
+    }
+
+
+class TestSparqlBackend(unittest.TestCase):
+    @unittest.skipIf(validator_module.pyoxigraph is None, "pyoxigraph not installed")
+    def test_matches_python_rules(self) -> None:
+        validator = validator_module.OncologyRulesValidator()
+        store = validator_module.load_patients_store(validator.patients)
+        sparql = validator_module.sparql_violations(store, validator.rules)
+        self.assertEqual(sparql, python_noncompliant(validator))
+
+
+class TestAdjuvantDuration(unittest.TestCase):
+    def setUp(self) -> None:
+        self.validator = validator_module.OncologyRulesValidator()
+        self.validator.patients = {
+            "FULL": tamoxifen_patient("FULL", ("2025-01-01", "2030-06-01")),
+            "OPEN": tamoxifen_patient("OPEN", ("2025-01-01", "2030-06-01"), ("2025-01-01", None)),
+            "SHORT": tamoxifen_patient("SHORT", ("2025-01-01", "2031-01-01"), ("2025-01-01", "2026-01-01")),
+        }
+
+    def test_every_course_is_checked(self) -> None:
+        self.assertEqual(python_noncompliant(self.validator)["R007"], ["OPEN", "SHORT"])
+
+    def test_backends_agree(self) -> None:
+        expected = python_noncompliant(self.validator)["R007"]
+        self.assertEqual(self.validator.cohort_violations()["R007"], expected)
+        if validator_module.pyoxigraph is not None:
+            store = validator_module.load_patients_store(self.validator.patients)
+            rules = [rule for rule in self.validator.rules if rule["id"] == "R007"]
+            self.assertEqual(validator_module.sparql_violations(store, rules)["R007"], expected)
+
+
+if __name__ == "__main__":
+    unittest.main()